@@ -12,9 +12,7 @@ https://www.sphinx-doc.org/en/latest/usage/configuration.html
 # add these directories to sys.path here. If the directory is relative to the
 # documentation root, use os.path.abspath to make it absolute, like shown here.
 
-import linecache
 import os
-import re
 import sys
 
 sys.path.insert(0, os.path.abspath('..'))
@@ -27,7 +25,11 @@ copyright = '2019-2024, ObserverOfTime, BSD 3-Clause License'
 author = 'ObserverOfTime'
 
 # The full version, including alpha/beta/rc tags
-release = re.search('"(.+)"', linecache.getline('pyproject.toml', 3)).group(1)
+with open('pyproject.toml') as _pyproject:
+    for _line in _pyproject:
+        if _line.startswith('version'):
+            release = _line.split('"')[1]
+            break
 
 # -- General configuration ---------------------------------------------------
 
@@ -1,14 +1,24 @@
+from os import environ, fspath
+from tempfile import mkstemp
+
 import pytest
 
 import yaenv
 
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def env():
     """Environment parser object."""
     return yaenv.Env('tests/.env')
 
 
+def test_module_getattr():
+    """it resolves the version lazily and rejects unknown attributes"""
+    assert yaenv.__version__
+    with pytest.raises(AttributeError):
+        _ = yaenv.missing
+
+
 class TestEnv:
     """Dotenv file parser"""
 
@@ -24,6 +34,14 @@ class TestEnv:
         assert env['NEW_VAR'] == 'new_var'
         env['NEW_VAR'] = 'newer var'
         assert env['NEW_VAR'] == 'newer var'
+        with open(env, 'rb') as f:
+            _content = f.read()
+        env['NEW_VAR'] = 'newer var'
+        with open(env, 'rb') as f:
+            assert f.read() == _content
+        env['ESCAPED_VAR'] = 'tab\tvalue'
+        del env['ESCAPED_VAR']
+        assert 'ESCAPED_VAR' not in env
 
     def test_delitem(self, env: yaenv.Env):
         """it can unset environment variables"""
@@ -43,30 +61,72 @@ class TestEnv:
     def test_interpolation(self, env: yaenv.Env):
         """it can interpolate variables"""
         assert env['EMAIL'] == f'user@{env["DOMAIN"]}'
+        assert env['URL'] == f'https://{env["EMAIL"]}'
 
     def test_setenv(self, env: yaenv.Env):
         """it can update os.environ"""
-        from os import environ
         assert 'EMAIL' not in environ
         env.setenv()
         assert 'EMAIL' in environ
 
-    def test_no_final_eol(self, env: yaenv.Env):
+    def test_batch(self, env: yaenv.Env):
+        """it can batch writes to the dotenv file"""
+        with env.batch():
+            env['BATCH_VAR1'] = 'one'
+            env['BATCH_VAR2'] = 'two'
+        assert env['BATCH_VAR2'] == 'two'
+        with env.batch():
+            env['BATCH_VAR1'] = 'uno'
+            del env['BATCH_VAR2']
+        with open(env, 'r') as f:
+            lines = f.readlines()
+        assert 'BATCH_VAR1="uno"\n' in lines
+        assert 'BATCH_VAR2="two"\n' not in lines
+        with pytest.raises(ValueError):
+            with env.batch():
+                env['BATCH_VAR3'] = 'three'
+                raise ValueError
+        assert 'BATCH_VAR3' not in env
+        with pytest.raises(yaenv.EnvError) as err:
+            with env.batch(), env.batch():
+                pass  # pragma: no cover
+        assert 'in progress' in str(err.value)
+        del env['BATCH_VAR1']
+
+    def test_batch_duplicate_keys(self):
+        """it rewrites duplicate keys in a batch"""
+        envfile = mkstemp()[-1]
+        with open(envfile, 'w') as f:
+            f.write('FOO=a\nBAR=x\nFOO=b\n')
+        env = yaenv.Env(envfile)
+        with env.batch():
+            env['FOO'] = 'new'
+            del env['BAR']
+        env = yaenv.Env(envfile)
+        assert env['FOO'] == 'new'
+        assert 'BAR' not in env
+
+    def test_no_final_eol(self):
         """it can parse a dotenv file without a final EOL"""
-        from tempfile import mkstemp
-        env.envfile = mkstemp()[-1]
-        with open(env, 'w') as f:
+        envfile = mkstemp()[-1]
+        with open(envfile, 'w') as f:
             f.write('EOL=no')
+        env = yaenv.Env(envfile)
         env['BLANK'] = ''
         with open(env, 'r') as f:
             assert len(f.readlines()) == 2
+        with open(envfile, 'a') as f:
+            f.write('EOL2=no')
+        with env.batch():
+            env['BLANK2'] = ''
+        with open(env, 'r') as f:
+            assert len(f.readlines()) == 4
 
     def test_fspath(self, env: yaenv.Env):
         """it returns the file system path of the dotenv file"""
-        from os import fspath
-        from filecmp import cmp
         assert fspath(env) == 'tests/.env'
-        assert cmp(env, 'tests/.env')
+        with open(env, 'rb') as f1, open('tests/.env', 'rb') as f2:
+            assert f1.read() == f2.read()
 
     def test_get(self, env: yaenv.Env):
         """it returns default values for optional variables"""
@@ -219,47 +279,60 @@ class TestEnvVar:
         assert yaenv.core.EnvVar("key=''").value == ''
         assert yaenv.core.EnvVar('key= ').value == ''
 
+    def test_inline_comment(self):
+        """it strips inline comments from unquoted values"""
+        assert yaenv.core.EnvVar('key=value # comment').value == 'value'
+        assert yaenv.core.EnvVar('key=value#comment').value == 'value'
+        assert yaenv.core.EnvVar('key=value#comment extra').value == 'value'
+
     def test_blank_line(self):
         """it ignores blank lines"""
         assert yaenv.core.EnvVar('\n') is None
         assert yaenv.core.EnvVar(' \t ') is None
         assert yaenv.core.EnvVar('# comment') is None
 
-    def test_invalid_key(self):
+    def test_dunders(self):
+        """it exposes its state through dunder methods"""
+        e = yaenv.core.EnvVar('key=value')
+        assert bool(e)
+        assert len(e) == 2
+        assert tuple(e) == ('key', 'value')
+        assert len(yaenv.core.EnvVar('key=')) == 1
+        assert yaenv.core.EnvVar.__len__(None) == 0
+
+    @pytest.mark.parametrize('line', [
+        '221b="starts with number"',
+        '_="not assignable"',
+        'o-o="invalid character"',
+    ])
+    def test_invalid_key(self, line: str):
         """it raises EnvError for invalid keys"""
         with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('221b="starts with number"')
-        assert 'Invalid key' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('_="not assignable"')
-        assert 'Invalid key' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('o-o="invalid character"')
+            _ = yaenv.core.EnvVar(line)
         assert 'Invalid key' in str(err.value)
 
-    def test_mismatched_quote(self):
+    @pytest.mark.parametrize('line', [
+        'double="missing-closing',
+        'double=missing-opening"',
+        "single='missing-closing",
+        "single=missing-opening'",
+        "both=\"mismatched'",
+        "both='mismatched\"",
+        'embedded=a"b"',
+    ])
+    def test_mismatched_quote(self, line: str):
         """it raises EnvError for mismatched quotes"""
         with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('double="missing-closing')
-        assert 'Mismatched quotes' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('double=missing-opening"')
-        assert 'Mismatched quotes' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar("single='missing-closing")
-        assert 'Mismatched quotes' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar("single=missing-opening'")
-        assert 'Mismatched quotes' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar("both=\"mismatched'")
-        assert 'Mismatched quotes' in str(err.value)
-        with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar("both='mismatched\"")
+            _ = yaenv.core.EnvVar(line)
         assert 'Mismatched quotes' in str(err.value)
 
-    def test_surplus_token(self):
+    @pytest.mark.parametrize('line', [
+        'surplus=this must be quoted',
+        'surplus="quoted" but not this',
+        'surplus=tab\tseparated',
+    ])
+    def test_surplus_token(self, line: str):
         """it raises EnvError for surplus tokens"""
         with pytest.raises(yaenv.EnvError) as err:
-            _ = yaenv.core.EnvVar('surplus=this must be quoted')
+            _ = yaenv.core.EnvVar(line)
         assert 'Surplus token' in str(err.value)
@@ -8,6 +8,8 @@ class TestUtils:
         """it can detect truthy values"""
         for val in utils._truthy:
             assert utils.is_truthy(val)
+        assert utils.is_truthy(True)
+        assert not utils.is_truthy(False)
         assert not utils.is_truthy('maybe')
         assert not utils.is_truthy(None)
 
@@ -15,5 +17,7 @@ class TestUtils:
         """it can detect falsy values"""
         for val in utils._falsy:
             assert utils.is_falsy(val)
+        assert utils.is_falsy(False)
+        assert not utils.is_falsy(True)
         assert not utils.is_falsy('maybe')
         assert not utils.is_falsy(None)
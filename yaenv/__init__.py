@@ -1,9 +1,22 @@
 """Yet another dotenv parser for Python."""
 
-from importlib.metadata import version
+from types import ModuleType
 
 from .core import Env, EnvError
 
-__version__: str = version(__name__)
+__version__: str
+
+
+def __getattr__(name: str) -> ModuleType | str:
+    """Resolve the version and helper submodules on first use."""
+    if name == '__version__':
+        from importlib.metadata import version
+        globals()['__version__'] = version(__name__)
+        return globals()['__version__']
+    if name in ('db', 'email'):
+        from importlib import import_module
+        return import_module(f'.{name}', __name__)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 __all__ = ['Env', 'EnvError']
@@ -2,16 +2,43 @@
 
 from __future__ import annotations
 
-from functools import cached_property
-from os import PathLike, environ, fspath, path
-from re import Match, compile as regex
+from collections import ChainMap
+from contextlib import contextmanager
+from os import (
+    SEEK_END,
+    PathLike,
+    chmod,
+    environ,
+    fdopen,
+    fspath,
+    path,
+    replace,
+    stat,
+)
+from re import ASCII, Match, compile as regex
 from secrets import token_urlsafe
-from shlex import shlex
-from shutil import move
+from sys import intern
 from tempfile import mkstemp
-from typing import Iterator, Literal, overload
+from typing import TYPE_CHECKING, Iterator, Literal, overload
 
-from . import db, email, utils
+from . import utils
+
+if TYPE_CHECKING:
+    from . import db, email
+
+_key = regex(r'[A-Za-z_][A-Za-z0-9_]*$', ASCII)
+
+_posix = regex(r'\$\{([^}]*)\}')
+
+_escapes = str.maketrans({'"': '\\"', '\n': '\\n', '\t': '\\t'})
+
+
+def _escape(value: str) -> str:
+    """Escape double quotes, newlines and tabs in the value."""
+    for char in '"\n\t':
+        if char in value:
+            return value.translate(_escapes)
+    return value
 
 
 class EnvError(Exception):
@@ -30,6 +57,8 @@ class EnvVar:
         The value of the variable.
     """
 
+    __slots__ = ('_interpolate', 'key', 'value')
+
     _interpolate: bool
     key: str
     value: str
@@ -61,55 +90,48 @@ class EnvVar:
         >>> print(repr(EnvVar('# comment')))
         None
         """
-        lex = shlex(line)
+        line = line.strip()
 
-        key = lex.read_token()
-        if not key:
+        # blank line or comment
+        if not line or line[0] == '#':
             return None
 
+        key, sep, value = line.partition('=')
+        key, value = key.strip(), value.strip()
+
         # invalid key
-        if (
-            not all(c in lex.wordchars for c in key)
-            or lex.get_token() != '='
-            or key == '_' or key[0] in '0123456789'
-        ):
+        if not sep or not _key.match(key) or key == '_':
             raise EnvError(f'Invalid key in line: {line}')
 
-        lex.whitespace_split = True
-        try:
-            value = lex.read_token()
-        except ValueError as e:
-            raise EnvError(f'Mismatched quotes in line: {line}') from e
-
-        # surplus token after value
-        if lex.read_token():
-            raise EnvError(f'Surplus token in line: {line}')
-
         instance = super(EnvVar, cls).__new__(cls)
-        instance.key = key
+        instance.key = intern(key)
 
-        # blank value
-        if not value:
+        # blank value (or nothing but a comment)
+        if not value or value[0] == '#':
             instance.value = ''
             instance._interpolate = False
             return instance
 
-        # double-quoted value
-        if value[0] == '"' or value[-1] == '"':
-            if not value[0] == value[-1]:
-                raise EnvError(f'Mismatched quotes in line: {line}')
-            instance.value = value[1:-1]
-            instance._interpolate = True
-            return instance
-
-        # single-quoted value
-        if value[0] == "'" or value[-1] == "'":
-            if not value[0] == value[-1]:
+        # quoted value
+        if value[0] in '"\'':
+            quote = value[0]
+            end = value.find(quote, 1)
+            if end < 0:
                 raise EnvError(f'Mismatched quotes in line: {line}')
-            instance.value = value[1:-1]
-            instance._interpolate = False
+            surplus = value[end + 1:].lstrip()
+            if surplus and surplus[0] != '#':
+                raise EnvError(f'Surplus token in line: {line}')
+            instance.value = value[1:end]
+            instance._interpolate = quote == '"'
             return instance
 
+        # unquoted value (an unspaced '#' still starts a comment)
+        parts = value.split(None, 1)
+        value, hashsign, _ = parts[0].partition('#')
+        if '"' in value or "'" in value:
+            raise EnvError(f'Mismatched quotes in line: {line}')
+        if not hashsign and len(parts) > 1 and parts[1][0] != '#':
+            raise EnvError(f'Surplus token in line: {line}')
         instance.value = value
         instance._interpolate = True
         return instance
@@ -184,8 +206,8 @@ class Env(PathLike):
     ----------
     ENV : os._Environ
         A reference to :os:`environ`.
-    envfile : str | :os:`PathLike`
-        The dotenv file of the object.
+    envfile : str
+        The path of the dotenv file, normalised to ``str``.
 
     Parameters
     ----------
@@ -204,8 +226,12 @@ class Env(PathLike):
     def __init__(self, envfile: str | PathLike) -> None:
         if not path.isfile(envfile):
             raise EnvError(f"File '{envfile}' does not exist")
-        self.envfile = envfile
+        self.envfile = fspath(envfile)
         self.ENV = environ
+        self._synced = False
+        self._vars: dict[str, str] | None = None
+        self._mtime = 0
+        self._batch: dict[str, str | None] | None = None
 
     def __getitem__(self, key: str) -> str:
         """
@@ -226,7 +252,9 @@ class Env(PathLike):
         EnvError
             If the environment variable is missing.
         """
-        value = self.ENV.get(key, self.vars.get(key))
+        value = self.ENV.get(key)
+        if value is None:
+            value = self.vars.get(key)
         if value is None:
             raise EnvError(f"Missing environment variable: '{key}'")
         return value
@@ -242,8 +270,18 @@ class Env(PathLike):
         value : str
             The value of the variable as ``str``.
         """
-        self.vars[key] = value
-        self._replace(key, value)
+        variables = self.vars
+        new = key not in variables
+        if not new and variables[key] == value:
+            return
+        variables[key] = value
+        self._synced = False
+        if self._batch is not None:
+            self._batch[key] = value
+        elif new:
+            self._append(key, value)
+        else:
+            self._replace(key, value)
 
     def __delitem__(self, key: str) -> None:
         """
@@ -264,7 +302,11 @@ class Env(PathLike):
         except KeyError:
             raise EnvError(f"Missing environment variable: '{key}'")
         else:
-            self._replace(key, None)
+            self._synced = False
+            if self._batch is not None:
+                self._batch[key] = None
+            else:
+                self._replace(key, None)
 
     def __iter__(self) -> Iterator[tuple[str, str]]:
         """
@@ -315,7 +357,7 @@ class Env(PathLike):
         str
             The path of the dotenv file.
         """
-        return fspath(self.envfile)
+        return self.envfile
 
     def __str__(self) -> str:  # pragma: no cover
         """
@@ -339,26 +381,103 @@ class Env(PathLike):
         """
         return f"Env('{self.envfile}')"
 
-    @cached_property
+    @property
     def vars(self) -> dict[str, str]:
-        """`dict[str, str]` : Get the environment variables as a ``dict``."""
+        """
+        `dict[str, str]` : Get the environment variables as a ``dict``.
+
+        The dotenv file is only re-parsed when its mtime changes.
+        """
         def _sub_callback(match: Match) -> str:
-            return (self.ENV | result).get(match.group(1), '')
+            key = intern(match.group(1))
+            value = lookup(key, '')
+            if key in unresolved:
+                # resolve references to unresolved variables first
+                del unresolved[key]
+                if '${' in value:
+                    value = result[key] = sub(_sub_callback, value)
+            return value
+
+        mtime = stat(self.envfile).st_mtime_ns
+        if self._vars is not None and mtime == self._mtime:
+            return self._vars
+
+        with open(self.envfile, 'rb') as f:
+            raw = f.read().decode()
+
+        result: dict[str, str] = {}
+        interpolate: list[EnvVar] = []
+        for var in map(EnvVar, raw.splitlines()):
+            if var is not None:
+                result[var.key] = var.value
+                if var._interpolate:
+                    interpolate.append(var)
+
+        # substitute variables that can be interpolated, resolving
+        # references in dependency order (cycles keep the raw value)
+        if '${' in raw:
+            lookup = ChainMap(result, self.ENV).get
+            sub = _posix.sub
+            unresolved = {
+                var.key: None for var in interpolate if '${' in var.value
+            }
+            while unresolved:
+                key = next(iter(unresolved))
+                del unresolved[key]
+                result[key] = sub(_sub_callback, result[key])
+
+        self._vars, self._mtime = result, mtime
+        return result
 
-        with open(self.envfile, 'r') as f:
-            envvars = list(filter(EnvVar.__len__, map(EnvVar, f.readlines())))
-            result = dict(envvars)  # type: ignore
+    def setenv(self) -> None:
+        """
+        Add the variables defined in the dotenv file to :os:`environ`.
 
-        # substitute variables that can be interpolated
-        posix = regex(r'\$\{([^}].*)?\}')
-        for var in filter(bool, envvars):
-            result[var.key] = posix.sub(_sub_callback, var.value)
+        Repeated calls are no-ops until a variable is set or unset.
+        """
+        if not self._synced:
+            self.ENV |= self.vars
+            self._synced = True
 
-        return result
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer dotenv file writes while setting multiple variables.
 
-    def setenv(self) -> None:
-        """Add the variables defined in the dotenv file to :os:`environ`."""
-        self.ENV |= self.vars
+        Inside the context, assignments and deletions only update the
+        in-memory mapping; the file is rewritten once on exit instead
+        of once per mutation. If the body raises, the pending writes
+        are discarded together with the cached mapping.
+
+        Yields
+        ------
+        None
+            Nothing; the context manager is used for its side effect.
+
+        Raises
+        ------
+        EnvError
+            If another batch is already in progress.
+
+        Examples
+        --------
+        >>> with env.batch():
+        ...     env['KEY1'] = 'value1'
+        ...     env['KEY2'] = 'value2'
+        """
+        if self._batch is not None:
+            raise EnvError('A batch is already in progress')
+        self._batch = {}
+        try:
+            yield
+            if self._batch:
+                self._flush(self._batch)
+        except BaseException:
+            # drop cached mutations that never reached the file
+            self._vars = None
+            raise
+        finally:
+            self._batch = None
 
     @overload
     def get(self, key: str, default: str) -> str: ...
@@ -387,7 +506,10 @@ class Env(PathLike):
         >>> env.get('STR_VAR', 'default')
         'value'
         """
-        return self.ENV.get(key, self.vars.get(key) or default)
+        value = self.ENV.get(key)
+        if value is None:
+            value = self.vars.get(key) or default
+        return value
 
     @overload
     def bool(self, key: str, default: bool) -> bool: ...
@@ -424,9 +546,10 @@ class Env(PathLike):
         value = self.get(key)
         if value is None:
             return default
-        if utils.is_truthy(value):
+        lowered = value.lower()
+        if lowered in utils._truthy:
             return True
-        if utils.is_falsy(value):
+        if lowered in utils._falsy:
             return False
         raise EnvError(f"Invalid boolean value: '{value}'")
 
@@ -577,6 +700,7 @@ class Env(PathLike):
         --------
         :meth:`yaenv.db.parse` : Database URL parser.
         """
+        from . import db
         value = self.get(key, default)
         if value is None:
             return None
@@ -618,6 +742,7 @@ class Env(PathLike):
         --------
         :meth:`yaenv.email.parse` : E-mail URL parser.
         """
+        from . import email
         value = self.get(key, default)
         if value is None:
             return None
@@ -648,29 +773,61 @@ class Env(PathLike):
             self[key] = value
         return value
 
-    def _replace(self, key: str, value: str | None) -> None:
-        target = mkstemp(prefix='yaenv')[-1]
-        pattern = regex(fr'^\s*{key}\s*=')
-        replaced = value is None  # can't replace if there's no value
+    def _flush(self, pending: dict[str, str | None]) -> None:
+        dirname = path.dirname(self.envfile) or '.'
+        fd, target = mkstemp(prefix='yaenv', dir=dirname)
+        chmod(target, stat(self.envfile).st_mode)
+        line = '\n'
 
-        if value is not None:
-            value = value.replace('"', '\\"') \
-                    .replace('\n', '\\n').replace('\t', '\\t')
-            newline = f'{key}="{value}"\n'
+        seen: set[str] = set()
+        with fdopen(fd, 'w', encoding='utf-8') as tf, \
+                open(self.envfile, 'r', encoding='utf-8') as sf:
+            for line in sf:
+                key = line.partition('=')[0].strip()
+                if key in pending:
+                    # rewrite duplicates too, lest a stale line win
+                    seen.add(key)
+                    value = pending[key]
+                    if value is not None:
+                        tf.write(f'{key}="{_escape(value)}"\n')
+                else:
+                    tf.write(line)
+            if len(seen) < len(pending):
+                if not line.endswith('\n'):
+                    tf.write('\n')  # ensure new line
+                for key, value in pending.items():
+                    if value is not None and key not in seen:
+                        tf.write(f'{key}="{_escape(value)}"\n')
+
+        replace(target, self.envfile)
+        self._mtime = stat(self.envfile).st_mtime_ns
+
+    def _append(self, key: str, value: str) -> None:
+        with open(self.envfile, 'rb+') as f:
+            if f.seek(0, SEEK_END):
+                f.seek(-1, SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')  # ensure new line
+            f.write(f'{key}="{_escape(value)}"\n'.encode())
+        self._mtime = stat(self.envfile).st_mtime_ns
 
-        with open(target, 'w') as tf, open(self.envfile, 'r') as sf:
+    def _replace(self, key: str, value: str | None) -> None:
+        dirname = path.dirname(self.envfile) or '.'
+        fd, target = mkstemp(prefix='yaenv', dir=dirname)
+        chmod(target, stat(self.envfile).st_mode)
+        newline = None if value is None else f'{key}="{_escape(value)}"\n'
+
+        with fdopen(fd, 'w', encoding='utf-8') as tf, \
+                open(self.envfile, 'r', encoding='utf-8') as sf:
             for line in sf:
-                if not pattern.match(line):
+                head, sep, _ = line.partition('=')
+                if not sep or head.strip() != key:
                     tf.write(line)
-                elif value is not None:
+                elif newline is not None:
                     tf.write(newline)
-                    replaced = True
-            if not replaced:
-                if not line[-1] == '\n':
-                    tf.write('\n')  # ensure new line
-                tf.write(newline)
 
-        move(target, self.envfile)
+        replace(target, self.envfile)
+        self._mtime = stat(self.envfile).st_mtime_ns
 
 
 __all__ = ['Env', 'EnvError', 'EnvVar']
@@ -1,5 +1,6 @@
 """Database URL parser."""
 
+from functools import lru_cache
 from typing import Any, NewType
 from urllib import parse as urlparse
 
@@ -21,8 +22,28 @@ SCHEMES['postgres'] = SCHEMES['pgsql']
 SCHEMES['postgresql'] = SCHEMES['pgsql']
 SCHEMES['sqlite3'] = SCHEMES['sqlite']
 
-# Register database schemes in URLs.
-urlparse.uses_netloc += list(SCHEMES)
+# Register database schemes in URLs, skipping duplicates;
+# _netloc mirrors uses_netloc for O(1) membership checks.
+_netloc = set(urlparse.uses_netloc)
+for _scheme in SCHEMES:
+    if _scheme not in _netloc:
+        _netloc.add(_scheme)
+        urlparse.uses_netloc.append(_scheme)
+
+
+# Transaction isolation levels.
+_isolation_levels = {
+    'uncommitted': 4,
+    'serializable': 3,
+    'repeatable': 2,
+    'committed': 1,
+    'autocommit': 0,
+}
+
+
+def _unquote(value: str) -> str:
+    """Percent-decode the value only when it contains an escape."""
+    return urlparse.unquote(value) if '%' in value else value
 
 
 def add_scheme(scheme: str, backend: str) -> None:
@@ -41,13 +62,20 @@ def add_scheme(scheme: str, backend: str) -> None:
     >>> add_scheme('mysql-connector', 'mysql.connector.django')
     """
     SCHEMES[scheme] = backend
-    urlparse.uses_netloc.append(scheme)
+    if scheme not in _netloc:
+        _netloc.add(scheme)
+        urlparse.uses_netloc.append(scheme)
+    parse.cache_clear()
 
 
+@lru_cache(maxsize=128)
 def parse(url: str) -> DBConfig:
     """
     Parse a database URL.
 
+    Results are cached per URL, so the returned
+    dictionary should not be modified in place.
+
     Parameters
     ----------
     url : str
@@ -80,41 +108,34 @@ def parse(url: str) -> DBConfig:
         })
 
     # Parse the given URL.
-    uri = urlparse.urlparse(url)
+    uri = urlparse.urlsplit(url)
 
     # Update with environment configuration.
     config = DBConfig({
         'ENGINE': SCHEMES[uri.scheme],
-        'NAME': urlparse.unquote(uri.path[1:] or ''),
-        'USER': urlparse.unquote(uri.username or ''),
-        'PASSWORD': urlparse.unquote(uri.password or ''),
+        'NAME': _unquote(uri.path[1:] or ''),
+        'USER': _unquote(uri.username or ''),
+        'PASSWORD': _unquote(uri.password or ''),
         'HOST': uri.hostname or '',
         'PORT': str(uri.port or ''),
     })
 
     # Pass the query string into OPTIONS.
     options: dict[str, Any] = {}
-    qs = urlparse.parse_qs(uri.query)
-    for key, values in qs.items():
+    for key, value in urlparse.parse_qsl(uri.query):
         if key == 'isolation':
-            options['isolation_level'] = {
-                'uncommitted': 4,
-                'serializable': 3,
-                'repeatable': 2,
-                'committed': 1,
-                'autocommit': 0,
-            }.get(values[-1], None)
+            options['isolation_level'] = _isolation_levels.get(value)
             continue
         if key == 'search_path':
-            options['options'] = f'-c search_path={values[-1]}'
+            options['options'] = f'-c search_path={value}'
             continue
         if key in ('autocommit', 'atomic_requests'):
-            config[key.upper()] = is_truthy(values[-1])
+            config[key.upper()] = is_truthy(value)
             continue
         if key == 'conn_max_age':
-            config['CONN_MAX_AGE'] = int(values[-1])
+            config['CONN_MAX_AGE'] = int(value)
             continue
-        options[key] = values[-1]
+        options[key] = value
 
     if options:
         config['OPTIONS'] = options
@@ -1,5 +1,6 @@
 """E-mail URL parser."""
 
+from functools import lru_cache
 from typing import Any, NewType
 from urllib import parse as urlparse
 
@@ -21,14 +22,35 @@ SCHEMES: dict[str, str] = {
 SCHEMES['smtp+ssl'] = SCHEMES['smtp']
 SCHEMES['smtp+tls'] = SCHEMES['smtp']
 
-# Register e-mail schemes in URLs.
-urlparse.uses_netloc += list(SCHEMES)
+# Register e-mail schemes in URLs, skipping duplicates.
+_netloc = set(urlparse.uses_netloc)
+for _scheme in SCHEMES:
+    if _scheme not in _netloc:
+        _netloc.add(_scheme)
+        urlparse.uses_netloc.append(_scheme)
 
 
+def _unquote(value: str) -> str:
+    """Percent-decode the value only when it contains an escape."""
+    return urlparse.unquote(value) if '%' in value else value
+
+
+# Default port and security flag per SMTP scheme.
+_smtp_schemes: dict[str, tuple[int, str | None]] = {
+    'smtp': (25, None),
+    'smtp+tls': (587, 'EMAIL_USE_TLS'),
+    'smtp+ssl': (465, 'EMAIL_USE_SSL'),
+}
+
+
+@lru_cache(maxsize=128)
 def parse(url: str) -> EmailConfig:
     """
     Parse an e-mail URL.
 
+    Results are cached per URL, so the returned
+    dictionary should not be modified in place.
+
     Parameters
     ----------
     url : str
@@ -53,13 +75,13 @@ def parse(url: str) -> EmailConfig:
     }
     """
     # Parse the given URL.
-    uri = urlparse.urlparse(url)
+    uri = urlparse.urlsplit(url)
 
     # Update with environment configuration
     config = EmailConfig({
         'EMAIL_BACKEND': SCHEMES[uri.scheme],
-        'EMAIL_HOST_USER': urlparse.unquote(uri.username or ''),
-        'EMAIL_HOST_PASSWORD': urlparse.unquote(uri.password or ''),
+        'EMAIL_HOST_USER': _unquote(uri.username or ''),
+        'EMAIL_HOST_PASSWORD': _unquote(uri.password or ''),
         'EMAIL_HOST': uri.hostname or 'localhost',
     })
 
@@ -67,39 +89,31 @@ def parse(url: str) -> EmailConfig:
     if uri.scheme == 'file':
         config['EMAIL_FILE_PATH'] = uri.path[1:]
 
-    # Set config for smtp.
-    if uri.scheme == 'smtp':
-        config['EMAIL_PORT'] = uri.port or 25
-        if uri.port == 587:
+    # Set config for the SMTP schemes.
+    if uri.scheme in _smtp_schemes:
+        port, flag = _smtp_schemes[uri.scheme]
+        config['EMAIL_PORT'] = uri.port or port
+        if flag is not None:
+            config[flag] = True
+        elif uri.port == 587:
             config['EMAIL_USE_TLS'] = True
-        if uri.port == 465:
+        elif uri.port == 465:
             config['EMAIL_USE_SSL'] = True
 
-    # Set config for smtp+tls.
-    if uri.scheme == 'smtp+tls':
-        config['EMAIL_PORT'] = uri.port or 587
-        config['EMAIL_USE_TLS'] = True
-
-    # Set config for smtp+ssl.
-    if uri.scheme == 'smtp+ssl':
-        config['EMAIL_PORT'] = uri.port or 465
-        config['EMAIL_USE_SSL'] = True
-
     # Set extra config from the query string.
-    qs = urlparse.parse_qs(uri.query)
-    for key, values in qs.items():
+    for key, value in urlparse.parse_qsl(uri.query):
         if key == 'tls':
-            config['EMAIL_USE_TLS'] = is_truthy(values[-1])
+            config['EMAIL_USE_TLS'] = is_truthy(value)
         if key == 'ssl':
-            config['EMAIL_USE_SSL'] = is_truthy(values[-1])
+            config['EMAIL_USE_SSL'] = is_truthy(value)
         if key == 'certfile':
-            config['EMAIL_SSL_CERTFILE'] = values[-1]
+            config['EMAIL_SSL_CERTFILE'] = value
         if key == 'keyfile':
-            config['EMAIL_SSL_KEYFILE'] = values[-1]
+            config['EMAIL_SSL_KEYFILE'] = value
         if key == 'timeout':
-            config['EMAIL_TIMEOUT'] = int(values[-1])
+            config['EMAIL_TIMEOUT'] = int(value)
         if key == 'localtime':
-            config['EMAIL_USE_LOCALTIME'] = is_truthy(values[-1])
+            config['EMAIL_USE_LOCALTIME'] = is_truthy(value)
 
     return config
 
@@ -2,9 +2,9 @@
 
 from typing import Any
 
-_truthy = ('1', 'on', 'y', 'yes', 'true')
+_truthy = frozenset({'1', 'on', 'y', 'yes', 'true'})
 
-_falsy = ('', '0', 'off', 'n', 'no', 'false')
+_falsy = frozenset({'', '0', 'off', 'n', 'no', 'false'})
 
 
 def is_truthy(arg: Any) -> bool:
@@ -28,7 +28,10 @@ def is_truthy(arg: Any) -> bool:
     >>> is_truthy(10)
     False
     """
-    return str(arg).lower() in _truthy
+    if type(arg) is bool:
+        return arg
+    value = arg if type(arg) is str else str(arg)
+    return value in _truthy or value.lower() in _truthy
 
 
 def is_falsy(arg: Any) -> bool:
@@ -52,7 +55,10 @@ def is_falsy(arg: Any) -> bool:
     >>> is_falsy(-1)
     False
     """
-    return str(arg).lower() in _falsy
+    if type(arg) is bool:
+        return not arg
+    value = arg if type(arg) is str else str(arg)
+    return value in _falsy or value.lower() in _falsy
 
 
 __all__ = ['is_truthy', 'is_falsy']